@@ -0,0 +1,322 @@
+"""
+Theme conversion core for convert_themes.py.
+
+Kept free of I/O so it can be compiled for speed with
+`cythonize -i script/convert_themes_core.py`; convert_themes.py picks up
+the compiled module automatically and uses this source otherwise.
+
+Interpreted, the style is built by a function generated from `_STYLE_TABLE`
+at import time. Generated code always runs interpreted, so the compiled
+module walks the table in a plain loop instead.
+"""
+
+import functools
+
+try:
+    import cython
+
+    _COMPILED = cython.compiled
+except ImportError:
+    _COMPILED = False
+
+# (name, default, tinted_background): when `tinted_background` is False the
+# `.background` variant is omitted unless the theme sets it, instead of
+# defaulting to a faint tint of the color.
+_STATUS_COLORS = [
+    ("conflict", "#f7768e", True),
+    ("created", "#9ece6a", True),
+    ("deleted", "#f7768e", True),
+    ("error", "#f7768e", True),
+    ("hidden", "#565f89", False),
+    ("hint", "#7dcfff", True),
+    ("ignored", "#565f89", False),
+    ("info", "#7aa2f7", True),
+    ("modified", "#e0af68", True),
+    ("predictive", "#565f89", False),
+    ("renamed", "#7aa2f7", True),
+    ("success", "#9ece6a", True),
+    ("unreachable", "#565f89", False),
+    ("warning", "#e0af68", True),
+]
+
+# (style key, ((source, source key), ...), default): each style key takes the
+# first of its lookups that the theme sets, else the default.
+_STYLE_TABLE = (
+    ("background", (("colors", "background"),), "#1a1b26"),
+    ("text", (("colors", "foreground"),), "#c0caf5"),
+    ("text.muted", (("colors", "muted.foreground"),), "#565f89"),
+    ("text.accent", (("colors", "foreground"),), "#c0caf5"),
+    ("text.placeholder", (("colors", "muted.foreground"),), "#565f89"),
+    ("text.disabled", (("colors", "muted.foreground"),), "#565f89"),
+    ("border", (("colors", "border"),), "#292e42"),
+    ("border.variant", (("colors", "border"),), "#292e42"),
+    ("border.focused", (("colors", "primary.background"),), "#7aa2f7"),
+    ("border.selected", (("colors", "primary.background"),), "#7aa2f7"),
+    ("border.disabled", (("colors", "input.border"), ("colors", "border")), "#292e42"),
+    (
+        "panel.background",
+        (("colors", "panel.background"), ("colors", "muted.background")),
+        "#292e42",
+    ),
+    ("panel.focused_border", (("colors", "primary.background"),), "#7aa2f7"),
+    ("panel.indent_guide", (("colors", "muted.background"),), "#292e42"),
+    ("panel.indent_guide_active", (("colors", "primary.background"),), "#7aa2f7"),
+    (
+        "elevated_surface.background",
+        (("colors", "popover.background"), ("colors", "background")),
+        "#1a1b26",
+    ),
+    ("surface.background", (("colors", "muted.background"),), "#292e42"),
+    (
+        "tab_bar.background",
+        (("colors", "tab_bar.background"), ("colors", "title_bar.background")),
+        "#161720",
+    ),
+    (
+        "tab.active_background",
+        (("colors", "tab.active.background"), ("colors", "background")),
+        "#1a1b26",
+    ),
+    (
+        "tab.inactive_background",
+        (("colors", "secondary.background"), ("colors", "muted.background")),
+        "#292e42",
+    ),
+    (
+        "tab.text",
+        (("colors", "tab.foreground"), ("colors", "muted.foreground")),
+        "#565f89",
+    ),
+    (
+        "tab.active_text",
+        (("colors", "tab.active.foreground"), ("colors", "foreground")),
+        "#c0caf5",
+    ),
+    ("title_bar.background", (("colors", "title_bar.background"),), "#161720"),
+    ("title_bar.inactive_background", (("colors", "title_bar.background"),), "#161720"),
+    (
+        "toolbar.background",
+        (("colors", "panel.background"), ("colors", "muted.background")),
+        "#292e42",
+    ),
+    ("status_bar.background", (("colors", "title_bar.background"),), "#161720"),
+    ("icon", (("colors", "foreground"),), "#c0caf5"),
+    ("icon.muted", (("colors", "muted.foreground"),), "#565f89"),
+    ("icon.accent", (("colors", "primary.background"),), "#7aa2f7"),
+    ("icon.disabled", (("colors", "muted.foreground"),), "#565f89"),
+    ("icon.placeholder", (("colors", "muted.foreground"),), "#565f89"),
+    (
+        "element.background",
+        (("colors", "secondary.background"), ("colors", "muted.background")),
+        "#292e42",
+    ),
+    ("element.hover", (("colors", "secondary.hover.background"),), "#31374f"),
+    ("element.active", (("colors", "primary.background"),), "#7aa2f7"),
+    ("element.selected", (("colors", "list.active.background"),), "#7aa2f722"),
+    ("element.disabled", (("colors", "muted.foreground"),), "#565f89"),
+    ("ghost_element.hover", (("colors", "list.active.background"),), "#7aa2f711"),
+    ("ghost_element.active", (("colors", "list.active.background"),), "#7aa2f722"),
+    ("ghost_element.selected", (("colors", "list.active.background"),), "#7aa2f722"),
+    ("ghost_element.disabled", (("colors", "muted.foreground"),), "#565f89"),
+    ("drop_target.background", (("colors", "list.active.background"),), "#7aa2f722"),
+    (
+        "link_text.hover",
+        (("colors", "link.hover.foreground"), ("colors", "link.foreground")),
+        "#7aa2f7",
+    ),
+    ("scrollbar.track.background", (("colors", "scrollbar.background"),), "#1a1b2600"),
+    (
+        "scrollbar.thumb.background",
+        (("colors", "scrollbar.thumb.background"),),
+        "#414868",
+    ),
+    (
+        "scrollbar.thumb.hover_background",
+        (("colors", "primary.background"),),
+        "#7aa2f7",
+    ),
+    (
+        "editor.background",
+        (("highlight", "editor.background"), ("colors", "background")),
+        "#1a1b26",
+    ),
+    (
+        "editor.foreground",
+        (("highlight", "editor.foreground"), ("colors", "foreground")),
+        "#c0caf5",
+    ),
+    (
+        "editor.gutter.background",
+        (("highlight", "editor.background"), ("colors", "background")),
+        "#1a1b26",
+    ),
+    ("editor.line_number", (("highlight", "editor.line_number"),), "#565f89"),
+    (
+        "editor.active_line_number",
+        (("highlight", "editor.active_line_number"),),
+        "#c0caf5",
+    ),
+    (
+        "editor.active_line.background",
+        (("highlight", "editor.active_line.background"),),
+        "#292e42",
+    ),
+    (
+        "editor.highlighted_line.background",
+        (("highlight", "editor.active_line.background"),),
+        "#292e42",
+    ),
+    ("editor.indent_guide", (("colors", "muted.background"),), "#292e42"),
+    ("editor.indent_guide_active", (("colors", "primary.background"),), "#7aa2f7"),
+    ("editor.wrap_guide", (("colors", "muted.background"),), "#292e42"),
+    ("editor.active_wrap_guide", (("colors", "primary.background"),), "#7aa2f7"),
+    ("editor.invisible", (("colors", "muted.foreground"),), "#565f89"),
+    (
+        "editor.document_highlight.read_background",
+        (("colors", "list.active.background"),),
+        "#7aa2f711",
+    ),
+    (
+        "editor.document_highlight.write_background",
+        (("colors", "list.active.background"),),
+        "#7aa2f722",
+    ),
+    (
+        "editor.document_highlight.bracket_background",
+        (("colors", "list.active.background"),),
+        "#7aa2f722",
+    ),
+    ("search.match_background", (), "#e0af6844"),
+)
+
+# Shared by every converted theme; it is only ever serialized, never mutated.
+_PLAYERS = [
+    {"cursor": "#7aa2f7", "background": "#7aa2f7", "selection": "#364A82"},
+    {"cursor": "#9ece6a", "background": "#9ece6a", "selection": "#4A572A"},
+    {"cursor": "#e0af68", "background": "#e0af68", "selection": "#774A1A"},
+    {"cursor": "#f7768e", "background": "#f7768e", "selection": "#7F3A3A"},
+    {"cursor": "#bb9af7", "background": "#bb9af7", "selection": "#5A4A7A"},
+    {"cursor": "#7dcfff", "background": "#7dcfff", "selection": "#2A4A5A"},
+]
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_alpha11(color: str) -> str:
+    return f"{color}11"
+
+
+def _with_alpha11(color) -> str:
+    """Append a faint alpha channel to a hex color."""
+    if isinstance(color, str):
+        return _cached_alpha11(color)
+    return f"{color}11"
+
+
+def _compile_style_builder(table: tuple):
+    """Generate `_build_style(colors, highlight)` specialized for `table`.
+
+    Each distinct lookup is read once into a local and the style is returned
+    as a single dict literal instead of walking the table for every theme.
+    The first lookup that is set wins, else the default.
+    """
+    lookup_names = {}
+    value_names = {}
+    lines = ["def _build_style(colors, highlight):"]
+
+    for _, lookups, default in table:
+        for source, key in lookups:
+            if (source, key) not in lookup_names:
+                name = f"lookup_{len(lookup_names)}"
+                lookup_names[(source, key)] = name
+                lines.append(f"    {name} = {source}.get({key!r})")
+
+        if (lookups, default) not in value_names:
+            name = f"value_{len(value_names)}"
+            value_names[(lookups, default)] = name
+            expression = repr(default)
+            for lookup in reversed(lookups):
+                lookup_name = lookup_names[lookup]
+                expression = (
+                    f"{lookup_name} if {lookup_name} is not None else {expression}"
+                )
+            lines.append(f"    {name} = {expression}")
+
+    lines.append("    return {")
+    for style_key, lookups, default in table:
+        lines.append(f"        {style_key!r}: {value_names[(lookups, default)]},")
+    lines.append("    }")
+
+    namespace = {}
+    exec(compile("\n".join(lines), "<_build_style>", "exec"), namespace)
+    return namespace["_build_style"]
+
+
+def _build_style_from_table(colors: dict, highlight: dict) -> dict:
+    sources = {"colors": colors, "highlight": highlight}
+    style = {}
+    for style_key, lookups, default in _STYLE_TABLE:
+        value = None
+        for source, key in lookups:
+            value = sources[source].get(key)
+            if value is not None:
+                break
+        style[style_key] = value if value is not None else default
+    return style
+
+
+if _COMPILED:
+    _build_style = _build_style_from_table
+else:
+    _build_style = _compile_style_builder(_STYLE_TABLE)
+
+
+def convert_syntax(old_syntax: dict) -> dict:
+    """Convert ZQLZ syntax highlighting to Zed format."""
+    return {
+        key: {
+            "color": value.get("color", ""),
+            **({"font_style": value["font_style"]} if value.get("font_style") else {}),
+            **(
+                {"font_weight": value["font_weight"]}
+                if value.get("font_weight")
+                else {}
+            ),
+        }
+        for key, value in old_syntax.items()
+        if isinstance(value, dict)
+    }
+
+
+def convert_theme(old_theme: dict) -> dict:
+    """Convert a single ZQLZ theme to Zed format."""
+    colors = old_theme.get("colors", {})
+    highlight = old_theme.get("highlight", {})
+
+    mode = old_theme.get("mode", "dark")
+    appearance = "light" if mode == "light" else "dark"
+
+    style = _build_style(colors, highlight)
+
+    for name, default, tinted_background in _STATUS_COLORS:
+        base = highlight.get(name)
+        if base is None:
+            base = default
+        style[name] = base
+
+        background = highlight.get(f"{name}.background")
+        if background is None and tinted_background:
+            background = _with_alpha11(base)
+        if background is not None:
+            style[f"{name}.background"] = background
+
+        border = highlight.get(f"{name}.border")
+        style[f"{name}.border"] = border if border is not None else base
+
+    style["syntax"] = convert_syntax(highlight.get("syntax", {}))
+    style["players"] = _PLAYERS
+
+    return {
+        "name": old_theme.get("name", "Unknown"),
+        "appearance": appearance,
+        "style": style,
+    }